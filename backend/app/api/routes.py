@@ -1,36 +1,151 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime
-
-from app.models import get_db, WindFarm, NewsArticle
-from app.scraper import WindFarmNewsScraper
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from arq.connections import ArqRedis
+from arq.jobs import Job, JobStatus
+from sqlalchemy import select, tuple_, func, case
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from typing import AsyncIterator, Optional, Tuple
+from datetime import datetime, timezone
+import base64
+import math
+import orjson
+import redis.asyncio as redis
+
+from app.cache import (
+    get_redis, cache_get, cache_set, invalidate_cache,
+    MAP_DATA_KEY, MAP_DATA_TTL, STATS_KEY, STATS_TTL
+)
+from app.models import get_db, AsyncSessionLocal, WindFarm, NewsArticle, NO_DATE, news_sort_date
+from app.worker import get_queue
 
 router = APIRouter()
 
+# Columns returned by list endpoints; projecting them skips ORM object construction
+NEWS_LIST_COLS = (
+    NewsArticle.id, NewsArticle.title, NewsArticle.url, NewsArticle.source,
+    NewsArticle.published_date, NewsArticle.category, NewsArticle.location,
+    NewsArticle.latitude, NewsArticle.longitude
+)
+FARM_LIST_COLS = (
+    WindFarm.id, WindFarm.name, WindFarm.location, WindFarm.latitude, WindFarm.longitude,
+    WindFarm.capacity_mw, WindFarm.status, WindFarm.operator, WindFarm.description
+)
+
+
+# Keyset pagination cursors
+def _encode_cursor(key: str, row_id: int) -> str:
+    """Encode a (sort key, id) pair into an opaque pagination cursor"""
+    return base64.urlsafe_b64encode(f"{key}|{row_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a pagination cursor back into its (sort key, id) pair"""
+    try:
+        key, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit('|', 1)
+        return key, int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """Parse a "minLon,minLat,maxLon,maxLat" bounding box"""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(value) for value in bbox.split(','))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid bbox, expected minLon,minLat,maxLon,maxLat")
+
+    # float() accepts nan/inf, and NaN slips past every comparison below
+    if not all(math.isfinite(value) for value in (min_lon, min_lat, max_lon, max_lat)):
+        raise HTTPException(status_code=400, detail="Invalid bbox, values must be finite numbers")
+
+    if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180 and -90 <= min_lat <= 90 and -90 <= max_lat <= 90):
+        raise HTTPException(status_code=400, detail="Invalid bbox, coordinates out of range")
+
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="Invalid bbox, min values must not exceed max values")
+
+    return min_lon, min_lat, max_lon, max_lat
+
 
 # News Article Endpoints
-@router.get("/news", response_model=List[dict])
+NEWS_STREAM_BATCH = 200
+NEWS_MAX_LIMIT = 1000
+
+
+async def _stream_news(db: AsyncSession, result: AsyncResult, limit: int) -> AsyncIterator[bytes]:
+    """Stream a page of news as JSON, serializing rows in batches as they arrive from the cursor"""
+    count = 0
+    last = None
+
+    try:
+        yield b'{"data":['
+        async for rows in result.partitions():
+            chunk = b','.join(orjson.dumps(dict(row._mapping)) for row in rows)
+            yield (b',' if count else b'') + chunk
+            count += len(rows)
+            last = rows[-1]
+    finally:
+        await db.close()
+
+    next_cursor = None
+    if last is not None:
+        last_date = last.published_date.isoformat() if last.published_date else ''
+        next_cursor = _encode_cursor(last_date, last.id)
+
+    yield b'],"next_cursor":' + orjson.dumps(next_cursor) + b',"has_more":' + orjson.dumps(count == limit) + b'}'
+
+
+@router.get("/news")
 async def get_news(
-    limit: int = 50,
-    skip: int = 0,
-    category: Optional[str] = None,
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=NEWS_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    category: Optional[str] = None
 ):
-    """Get all news articles with optional filtering"""
-    query = db.query(NewsArticle)
+    """Get news articles (newest first) with keyset pagination and optional filtering"""
+    query = select(*NEWS_LIST_COLS)
 
     if category:
-        query = query.filter(NewsArticle.category == category)
-
-    articles = query.order_by(NewsArticle.published_date.desc()).offset(skip).limit(limit).all()
-    return [article.to_dict() for article in articles]
+        query = query.where(NewsArticle.category == category)
+
+    sort_date = news_sort_date()
+
+    if cursor:
+        date_str, last_id = _decode_cursor(cursor)
+        last_date = NO_DATE
+        if date_str:
+            try:
+                last_date = datetime.fromisoformat(date_str)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            # published_date is stored as naive UTC
+            if last_date.tzinfo is not None:
+                last_date = last_date.astimezone(timezone.utc).replace(tzinfo=None)
+        # A single row comparison on the indexed sort key, so the scan starts at the cursor
+        query = query.where(tuple_(sort_date, NewsArticle.id) < tuple_(last_date, last_id))
+
+    query = query.order_by(sort_date.desc(), NewsArticle.id.desc()).limit(limit)
+
+    # Run the query before sending headers so DB errors still surface as a 500. The session
+    # is our own: yield-dependencies are already closed while the response streams.
+    db = AsyncSessionLocal()
+    try:
+        result = await db.stream(query.execution_options(yield_per=NEWS_STREAM_BATCH))
+    except Exception:
+        await db.close()
+        raise
+
+    return StreamingResponse(
+        _stream_news(db, result, limit),
+        media_type="application/json",
+        background=BackgroundTask(db.close)  # covers clients that disconnect before streaming starts
+    )
 
 
 @router.get("/news/{article_id}", response_model=dict)
-async def get_news_by_id(article_id: int, db: Session = Depends(get_db)):
+async def get_news_by_id(article_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific news article by ID"""
-    article = db.query(NewsArticle).filter(NewsArticle.id == article_id).first()
+    article = await db.get(NewsArticle, article_id)
 
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
@@ -39,59 +154,80 @@ async def get_news_by_id(article_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/news/scrape")
-async def scrape_news(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    """Trigger news scraping and save to database"""
-    scraper = WindFarmNewsScraper()
-    articles = scraper.scrape_all()
-
-    saved_count = 0
-    for article_data in articles:
-        # Check if article already exists
-        existing = db.query(NewsArticle).filter(NewsArticle.url == article_data['url']).first()
-
-        if not existing:
-            article = NewsArticle(
-                title=article_data['title'],
-                url=article_data['url'],
-                source=article_data['source'],
-                published_date=article_data.get('published_date'),
-                category=article_data.get('category', 'news'),
-                scraped_at=datetime.utcnow()
-            )
-            db.add(article)
-            saved_count += 1
-
-    db.commit()
+async def scrape_news(queue: ArqRedis = Depends(get_queue)):
+    """Queue a news scraping job; poll GET /news/scrape/{job_id} for the result"""
+    try:
+        job = await queue.enqueue_job('scrape_task')
+    except redis.RedisError:
+        raise HTTPException(status_code=503, detail="Job queue unavailable")
 
     return {
-        "message": "News scraping completed",
-        "total_scraped": len(articles),
-        "new_articles_saved": saved_count
+        "message": "News scraping queued",
+        "job_id": job.job_id
     }
 
 
+@router.get("/news/scrape/{job_id}")
+async def get_scrape_status(job_id: str, queue: ArqRedis = Depends(get_queue)):
+    """Get the status (and result, once finished) of a news scraping job"""
+    job = Job(job_id, queue)
+    try:
+        status = await job.status()
+        info = await job.result_info() if status == JobStatus.complete else None
+    except redis.RedisError:
+        raise HTTPException(status_code=503, detail="Job queue unavailable")
+
+    if status == JobStatus.not_found:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+
+    response = {"job_id": job_id, "status": status.value}
+
+    if info is not None:
+        response["success"] = info.success
+        response["result"] = info.result if info.success else str(info.result)
+
+    return response
+
+
 # Wind Farm Endpoints
-@router.get("/wind-farms", response_model=List[dict])
+FARM_MAX_LIMIT = 1000
+
+
+@router.get("/wind-farms", response_model=dict)
 async def get_wind_farms(
-    limit: int = 100,
-    skip: int = 0,
+    limit: int = Query(100, ge=1, le=FARM_MAX_LIMIT),
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all wind farms with optional filtering"""
-    query = db.query(WindFarm)
+    """Get wind farms (by name) with keyset pagination and optional filtering"""
+    query = select(*FARM_LIST_COLS)
 
     if status:
-        query = query.filter(WindFarm.status == status)
+        query = query.where(WindFarm.status == status)
 
-    wind_farms = query.order_by(WindFarm.name).offset(skip).limit(limit).all()
-    return [farm.to_dict() for farm in wind_farms]
+    if cursor:
+        last_name, last_id = _decode_cursor(cursor)
+        query = query.where(tuple_(WindFarm.name, WindFarm.id) > tuple_(last_name, last_id))
+
+    result = await db.execute(query.order_by(WindFarm.name, WindFarm.id).limit(limit))
+    wind_farms = result.all()
+
+    next_cursor = None
+    if wind_farms:
+        next_cursor = _encode_cursor(wind_farms[-1].name, wind_farms[-1].id)
+
+    return {
+        "data": [dict(farm._mapping) for farm in wind_farms],
+        "next_cursor": next_cursor,
+        "has_more": len(wind_farms) == limit
+    }
 
 
 @router.get("/wind-farms/{farm_id}", response_model=dict)
-async def get_wind_farm_by_id(farm_id: int, db: Session = Depends(get_db)):
+async def get_wind_farm_by_id(farm_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific wind farm by ID"""
-    farm = db.query(WindFarm).filter(WindFarm.id == farm_id).first()
+    farm = await db.get(WindFarm, farm_id)
 
     if not farm:
         raise HTTPException(status_code=404, detail="Wind farm not found")
@@ -100,7 +236,11 @@ async def get_wind_farm_by_id(farm_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/wind-farms", response_model=dict)
-async def create_wind_farm(farm_data: dict, db: Session = Depends(get_db)):
+async def create_wind_farm(
+    farm_data: dict,
+    db: AsyncSession = Depends(get_db),
+    r: redis.Redis = Depends(get_redis)
+):
     """Create a new wind farm entry"""
     wind_farm = WindFarm(
         name=farm_data['name'],
@@ -114,47 +254,87 @@ async def create_wind_farm(farm_data: dict, db: Session = Depends(get_db)):
     )
 
     db.add(wind_farm)
-    db.commit()
-    db.refresh(wind_farm)
+    await db.commit()
+    await db.refresh(wind_farm)
+    await invalidate_cache(r)
 
     return wind_farm.to_dict()
 
 
 @router.get("/map-data")
-async def get_map_data(db: Session = Depends(get_db)):
-    """Get combined data for map visualization"""
+async def get_map_data(
+    bbox: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    r: redis.Redis = Depends(get_redis)
+):
+    """Get combined data for map visualization, optionally limited to a viewport bbox"""
+    # Only the full (unbounded) map is cached; viewport queries are served from the geo indexes
+    if not bbox:
+        cached = await cache_get(r, MAP_DATA_KEY)
+        if cached:
+            return Response(cached, media_type="application/json")
+
+    farms_query = select(*FARM_LIST_COLS)
+    news_query = select(*NEWS_LIST_COLS).where(
+        NewsArticle.latitude.isnot(None),
+        NewsArticle.longitude.isnot(None)
+    )
+
+    if bbox:
+        min_lon, min_lat, max_lon, max_lat = _parse_bbox(bbox)
+        farms_query = farms_query.where(
+            WindFarm.latitude.between(min_lat, max_lat),
+            WindFarm.longitude.between(min_lon, max_lon)
+        )
+        news_query = news_query.where(
+            NewsArticle.latitude.between(min_lat, max_lat),
+            NewsArticle.longitude.between(min_lon, max_lon)
+        )
+
     # Get wind farms
-    wind_farms = db.query(WindFarm).all()
+    wind_farms = (await db.execute(farms_query)).all()
 
     # Get news articles with location data
-    news_with_location = db.query(NewsArticle).filter(
-        NewsArticle.latitude.isnot(None),
-        NewsArticle.longitude.isnot(None)
-    ).order_by(NewsArticle.published_date.desc()).limit(50).all()
+    news_with_location = (await db.execute(
+        news_query.order_by(news_sort_date().desc(), NewsArticle.id.desc()).limit(50)
+    )).all()
 
-    return {
-        "wind_farms": [farm.to_dict() for farm in wind_farms],
-        "news_locations": [article.to_dict() for article in news_with_location]
+    result = {
+        "wind_farms": [dict(farm._mapping) for farm in wind_farms],
+        "news_locations": [dict(article._mapping) for article in news_with_location]
     }
+    if not bbox:
+        await cache_set(r, MAP_DATA_KEY, MAP_DATA_TTL, orjson.dumps(result))
+
+    # Hand the payload straight to orjson, skipping jsonable_encoder
+    return ORJSONResponse(result)
 
 
 @router.get("/stats")
-async def get_statistics(db: Session = Depends(get_db)):
+async def get_statistics(db: AsyncSession = Depends(get_db), r: redis.Redis = Depends(get_redis)):
     """Get general statistics"""
-    total_farms = db.query(WindFarm).count()
-    total_news = db.query(NewsArticle).count()
-
-    operational_farms = db.query(WindFarm).filter(WindFarm.status == 'operational').count()
-    planned_farms = db.query(WindFarm).filter(WindFarm.status == 'planned').count()
-
-    total_capacity = db.query(WindFarm).filter(WindFarm.capacity_mw.isnot(None)).with_entities(
-        db.func.sum(WindFarm.capacity_mw)
-    ).scalar() or 0
-
-    return {
+    cached = await cache_get(r, STATS_KEY)
+    if cached:
+        return Response(cached, media_type="application/json")
+
+    # Single pass over wind_farms for all farm aggregates
+    farm_stats = await db.execute(select(
+        func.count(WindFarm.id),
+        func.count(case((WindFarm.status == 'operational', 1))),
+        func.count(case((WindFarm.status == 'planned', 1))),
+        func.coalesce(func.sum(WindFarm.capacity_mw), 0)
+    ))
+    total_farms, operational_farms, planned_farms, total_capacity = farm_stats.one()
+
+    total_news = await db.scalar(select(func.count(NewsArticle.id)))
+
+    result = {
         "total_wind_farms": total_farms,
         "operational_farms": operational_farms,
         "planned_farms": planned_farms,
         "total_capacity_mw": float(total_capacity),
         "total_news_articles": total_news
     }
+    await cache_set(r, STATS_KEY, STATS_TTL, orjson.dumps(result))
+
+    return result
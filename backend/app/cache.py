@@ -0,0 +1,58 @@
+import os
+import logging
+import redis.asyncio as redis
+from fastapi import Request
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Redis configuration
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Cached response keys (bump the version suffix when the payload shape changes)
+MAP_DATA_KEY = "map-data:v2"
+STATS_KEY = "stats:v1"
+
+MAP_DATA_TTL = 60
+STATS_TTL = 120
+
+
+def create_redis() -> redis.Redis:
+    """Create the Redis client used for response caching"""
+    # Short timeouts so an unreachable Redis degrades to a cache miss instead of a stalled request
+    return redis.from_url(REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+
+
+def get_redis(request: Request) -> redis.Redis:
+    """Dependency for getting the shared Redis client"""
+    return request.app.state.redis
+
+
+# The cache is best-effort: on a Redis outage, log and let callers fall back to the database
+
+async def cache_get(r: redis.Redis, key: str) -> Optional[bytes]:
+    """Get a cached response, or None on a miss or Redis error"""
+    try:
+        return await r.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Redis GET {key} failed: {e}")
+        return None
+
+
+async def cache_set(r: redis.Redis, key: str, ttl: int, value: bytes):
+    """Cache a response for ttl seconds, ignoring Redis errors"""
+    try:
+        await r.setex(key, ttl, value)
+    except redis.RedisError as e:
+        logger.warning(f"Redis SETEX {key} failed: {e}")
+
+
+async def invalidate_cache(r: redis.Redis):
+    """Drop cached responses that depend on wind farm or news data"""
+    try:
+        await r.delete(MAP_DATA_KEY, STATS_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"Redis cache invalidation failed: {e}")
@@ -1,10 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import os
+import orjson
 from dotenv import load_dotenv
 
 from app.api import routes
+from app.cache import create_redis
 from app.models import Base, engine
 
 # Load environment variables
@@ -15,9 +19,16 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup: Create database tables
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    app.state.redis = create_redis()
+    app.state.queue = None  # job queue connects on first use (see get_queue)
     yield
-    # Shutdown: cleanup if needed
+    # Shutdown: close Redis and database connections
+    if app.state.queue is not None:
+        await app.state.queue.aclose()
+    await app.state.redis.aclose()
+    await engine.dispose()
 
 
 # Create FastAPI application
@@ -25,6 +36,7 @@ app = FastAPI(
     title="WindNewsMapper API",
     description="API for wind farm news mapping and web scraping",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -39,21 +51,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses (lists and map data repeat keys, URLs and source names)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Include API routes
 app.include_router(routes.router, prefix="/api")
 
 
+# Static payloads, serialized once (health checks are polled constantly)
+_ROOT_RESPONSE = orjson.dumps({
+    "message": "WindNewsMapper API",
+    "version": "1.0.0",
+    "status": "running"
+})
+_HEALTH_RESPONSE = orjson.dumps({"status": "healthy"})
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "message": "WindNewsMapper API",
-        "version": "1.0.0",
-        "status": "running"
-    }
+    return Response(_ROOT_RESPONSE, media_type="application/json")
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    return Response(_HEALTH_RESPONSE, media_type="application/json")
@@ -1,13 +1,34 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import ciso8601
+import httpx
+from selectolax.parser import HTMLParser
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 import re
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Non-ISO date formats seen on source pages
+_DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d.%m.%Y')
+
+# Common Polish voivodeships
+_VOIVODESHIPS = (
+    'pomorskie', 'zachodniopomorskie', 'wielkopolskie', 'kujawsko-pomorskie',
+    'warmińsko-mazurskie', 'podlaskie', 'mazowieckie', 'łódzkie', 'lubelskie',
+    'podkarpackie', 'małopolskie', 'śląskie', 'opolskie', 'dolnośląskie',
+    'lubuskie', 'świętokrzyskie'
+)
+
+# One alternation matched in a single C-level scan; longest names first plus the leading
+# word boundary keep 'zachodniopomorskie' from being reported as 'pomorskie'. No trailing
+# boundary, so inflected forms ('województwa śląskiego', 'woj. mazowieckiego') still match.
+_VOIVODESHIP_RE = re.compile(
+    r'\b(?:' + '|'.join(map(re.escape, sorted(_VOIVODESHIPS, key=len, reverse=True))) + r')',
+    re.IGNORECASE
+)
+
 
 class WindFarmNewsScraper:
     """Web scraper for Polish wind farm and renewable energy news"""
@@ -24,194 +45,258 @@ class WindFarmNewsScraper:
             'wnp': 'https://www.wnp.pl/oze/',
         }
 
-    def scrape_gramwzielone(self) -> List[Dict]:
-        """Scrape news from gramwzielone.pl"""
-        articles = []
-        try:
-            url = self.sources['gramwzielone']
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
+        # Shared client so keep-alive connections (and their TLS sessions) are reused across runs
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=10,
+            follow_redirects=True,
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                limits=httpx.Limits(max_connections=8, max_keepalive_connections=4)
+            )
+        )
+
+        # Last ETag / Last-Modified seen per source, sent back as conditional request headers.
+        # Validators from a run stay pending until its articles are saved (commit_validators),
+        # so a failed save doesn't turn the next run into a 304 that skips those articles.
+        self.validators: Dict[str, Dict[str, str]] = {}
+        self._pending_validators: Dict[str, Dict[str, str]] = {}
+
+    async def _fetch(self, source: str) -> Optional[bytes]:
+        """Fetch a source page; returns None if it is unchanged since the last fetch (HTTP 304)"""
+        cached = self.validators.get(source, {})
+        headers = {}
+        if 'etag' in cached:
+            headers['If-None-Match'] = cached['etag']
+        if 'last_modified' in cached:
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        response = await self.client.get(self.sources[source], headers=headers)
+
+        if response.status_code == 304:
+            logger.info(f"{source} unchanged since last scrape")
+            return None
 
-            soup = BeautifulSoup(response.content, 'lxml')
+        response.raise_for_status()
 
-            # Find article elements (adjust selectors based on actual website structure)
-            article_elements = soup.find_all('article', class_='post', limit=10)
+        validators = {}
+        if response.headers.get('ETag'):
+            validators['etag'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            validators['last_modified'] = response.headers['Last-Modified']
+        self._pending_validators[source] = validators
 
-            for article in article_elements:
-                try:
-                    title_elem = article.find('h2') or article.find('h3')
-                    link_elem = article.find('a')
-
-                    if title_elem and link_elem:
-                        title = title_elem.get_text(strip=True)
-                        url = link_elem.get('href')
-
-                        # Extract date if available
-                        date_elem = article.find('time')
-                        published_date = None
-                        if date_elem:
-                            date_str = date_elem.get('datetime') or date_elem.get_text(strip=True)
-                            published_date = self._parse_date(date_str)
-
-                        articles.append({
-                            'title': title,
-                            'url': url,
-                            'source': 'gramwzielone.pl',
-                            'published_date': published_date,
-                            'category': 'news'
-                        })
-                except Exception as e:
-                    logger.error(f"Error parsing article from gramwzielone: {e}")
-                    continue
+        return response.content
+
+    def commit_validators(self):
+        """Remember the validators of the last run; call once its articles are stored"""
+        self.validators.update(self._pending_validators)
+        self._pending_validators = {}
+
+    async def scrape_gramwzielone(self) -> List[Dict]:
+        """Scrape news from gramwzielone.pl"""
+        try:
+            html = await self._fetch('gramwzielone')
+            if html is None:
+                return []
+
+            return self._parse_gramwzielone(html)
 
         except Exception as e:
             logger.error(f"Error scraping gramwzielone: {e}")
+            return []
+
+    def _parse_gramwzielone(self, html: bytes) -> List[Dict]:
+        """Parse article list from gramwzielone.pl HTML"""
+        articles = []
+        tree = HTMLParser(html)
+
+        # Find article elements (adjust selectors based on actual website structure)
+        article_elements = tree.css('article.post')[:10]
+
+        for article in article_elements:
+            try:
+                title_elem = article.css_first('h2') or article.css_first('h3')
+                link_elem = article.css_first('a')
+
+                if title_elem and link_elem:
+                    title = title_elem.text(strip=True)
+                    url = link_elem.attributes.get('href')
+
+                    # Extract date if available
+                    date_elem = article.css_first('time')
+                    published_date = None
+                    if date_elem:
+                        date_str = date_elem.attributes.get('datetime') or date_elem.text(strip=True)
+                        published_date = self._parse_date(date_str)
+
+                    articles.append({
+                        'title': title,
+                        'url': url,
+                        'source': 'gramwzielone.pl',
+                        'published_date': published_date,
+                        'category': 'news'
+                    })
+            except Exception as e:
+                logger.error(f"Error parsing article from gramwzielone: {e}")
+                continue
 
         return articles
 
-    def scrape_wysokienapiecie(self) -> List[Dict]:
+    async def scrape_wysokienapiecie(self) -> List[Dict]:
         """Scrape news from wysokienapiecie.pl"""
-        articles = []
         try:
-            url = self.sources['wysokienapiecie']
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
+            html = await self._fetch('wysokienapiecie')
+            if html is None:
+                return []
 
-            soup = BeautifulSoup(response.content, 'lxml')
-
-            # Find article elements
-            article_elements = soup.find_all('article', limit=10)
-
-            for article in article_elements:
-                try:
-                    title_elem = article.find('h2', class_='entry-title') or article.find('h2')
-                    link_elem = title_elem.find('a') if title_elem else None
-
-                    if link_elem:
-                        title = link_elem.get_text(strip=True)
-                        url = link_elem.get('href')
-
-                        # Extract date
-                        date_elem = article.find('time')
-                        published_date = None
-                        if date_elem:
-                            date_str = date_elem.get('datetime') or date_elem.get_text(strip=True)
-                            published_date = self._parse_date(date_str)
-
-                        articles.append({
-                            'title': title,
-                            'url': url,
-                            'source': 'wysokienapiecie.pl',
-                            'published_date': published_date,
-                            'category': 'news'
-                        })
-                except Exception as e:
-                    logger.error(f"Error parsing article from wysokienapiecie: {e}")
-                    continue
+            return self._parse_wysokienapiecie(html)
 
         except Exception as e:
             logger.error(f"Error scraping wysokienapiecie: {e}")
+            return []
+
+    def _parse_wysokienapiecie(self, html: bytes) -> List[Dict]:
+        """Parse article list from wysokienapiecie.pl HTML"""
+        articles = []
+        tree = HTMLParser(html)
+
+        # Find article elements
+        article_elements = tree.css('article')[:10]
+
+        for article in article_elements:
+            try:
+                title_elem = article.css_first('h2.entry-title') or article.css_first('h2')
+                link_elem = title_elem.css_first('a') if title_elem else None
+
+                if link_elem:
+                    title = link_elem.text(strip=True)
+                    url = link_elem.attributes.get('href')
+
+                    # Extract date
+                    date_elem = article.css_first('time')
+                    published_date = None
+                    if date_elem:
+                        date_str = date_elem.attributes.get('datetime') or date_elem.text(strip=True)
+                        published_date = self._parse_date(date_str)
+
+                    articles.append({
+                        'title': title,
+                        'url': url,
+                        'source': 'wysokienapiecie.pl',
+                        'published_date': published_date,
+                        'category': 'news'
+                    })
+            except Exception as e:
+                logger.error(f"Error parsing article from wysokienapiecie: {e}")
+                continue
 
         return articles
 
-    def scrape_wnp(self) -> List[Dict]:
+    async def scrape_wnp(self) -> List[Dict]:
         """Scrape news from wnp.pl"""
-        articles = []
         try:
-            url = self.sources['wnp']
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'lxml')
+            html = await self._fetch('wnp')
+            if html is None:
+                return []
 
-            # Find article elements
-            article_elements = soup.find_all('div', class_='news-item', limit=10)
-
-            for article in article_elements:
-                try:
-                    link_elem = article.find('a')
-
-                    if link_elem:
-                        title = link_elem.get_text(strip=True)
-                        url = link_elem.get('href')
-
-                        if not url.startswith('http'):
-                            url = f"https://www.wnp.pl{url}"
-
-                        articles.append({
-                            'title': title,
-                            'url': url,
-                            'source': 'wnp.pl',
-                            'published_date': None,
-                            'category': 'news'
-                        })
-                except Exception as e:
-                    logger.error(f"Error parsing article from wnp: {e}")
-                    continue
+            return self._parse_wnp(html)
 
         except Exception as e:
             logger.error(f"Error scraping wnp: {e}")
+            return []
 
-        return articles
+    def _parse_wnp(self, html: bytes) -> List[Dict]:
+        """Parse article list from wnp.pl HTML"""
+        articles = []
+        tree = HTMLParser(html)
+
+        # Find article elements
+        article_elements = tree.css('div.news-item')[:10]
+
+        for article in article_elements:
+            try:
+                link_elem = article.css_first('a')
+
+                if link_elem:
+                    title = link_elem.text(strip=True)
+                    url = link_elem.attributes.get('href')
 
-    def scrape_all(self) -> List[Dict]:
-        """Scrape news from all sources"""
-        all_articles = []
+                    if not url.startswith('http'):
+                        url = f"https://www.wnp.pl{url}"
 
+                    articles.append({
+                        'title': title,
+                        'url': url,
+                        'source': 'wnp.pl',
+                        'published_date': None,
+                        'category': 'news'
+                    })
+            except Exception as e:
+                logger.error(f"Error parsing article from wnp: {e}")
+                continue
+
+        return articles
+
+    async def scrape_all(self) -> List[Dict]:
+        """Scrape news from all sources concurrently, de-duplicated by URL"""
         logger.info("Starting to scrape all sources...")
+        self._pending_validators = {}
 
-        all_articles.extend(self.scrape_gramwzielone())
-        all_articles.extend(self.scrape_wysokienapiecie())
-        all_articles.extend(self.scrape_wnp())
+        results = await asyncio.gather(
+            self.scrape_gramwzielone(),
+            self.scrape_wysokienapiecie(),
+            self.scrape_wnp(),
+        )
+
+        # Keep the first occurrence of each URL (the same story can appear on several sources)
+        articles_by_url = {}
+        for source_articles in results:
+            for article in source_articles:
+                articles_by_url.setdefault(article['url'], article)
+        all_articles = list(articles_by_url.values())
 
         logger.info(f"Scraped {len(all_articles)} articles in total")
 
         return all_articles
 
+    async def aclose(self):
+        """Close the shared HTTP client"""
+        await self.client.aclose()
+
     def _parse_date(self, date_str: str) -> Optional[datetime]:
-        """Parse date string to datetime object"""
+        """Parse date string to a naive UTC datetime object"""
         if not date_str:
             return None
 
         try:
-            # Try ISO format first
-            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        except:
-            pass
-
-        try:
-            # Try common date formats
-            for fmt in ['%Y-%m-%d', '%d-%m-%Y', '%d.%m.%Y']:
+            # ISO 8601 (<time datetime=...>) is by far the most common input
+            parsed = ciso8601.parse_datetime(date_str)
+        except ValueError:
+            for fmt in _DATE_FORMATS:
                 try:
                     return datetime.strptime(date_str, fmt)
-                except:
+                except ValueError:
                     continue
-        except:
-            pass
+            return None
 
-        return None
+        # published_date is a timestamp without time zone; asyncpg rejects aware values
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
 
     def extract_location(self, text: str) -> Optional[str]:
-        """Extract location from text (simple regex-based approach)"""
-        # Common Polish voivodeships
-        voivodeships = [
-            'pomorskie', 'zachodniopomorskie', 'wielkopolskie', 'kujawsko-pomorskie',
-            'warmińsko-mazurskie', 'podlaskie', 'mazowieckie', 'łódzkie', 'lubelskie',
-            'podkarpackie', 'małopolskie', 'śląskie', 'opolskie', 'dolnośląskie',
-            'lubuskie', 'świętokrzyskie'
-        ]
-
-        text_lower = text.lower()
-        for voivodeship in voivodeships:
-            if voivodeship in text_lower:
-                return voivodeship.capitalize()
-
-        return None
+        """Extract location (voivodeship) from text"""
+        match = _VOIVODESHIP_RE.search(text)
+        return match.group(0).capitalize() if match else None
 
 
 # Example usage function
-def scrape_wind_news():
+async def scrape_wind_news():
     """Main function to scrape wind farm news"""
     scraper = WindFarmNewsScraper()
-    articles = scraper.scrape_all()
+    try:
+        articles = await scraper.scrape_all()
+    finally:
+        await scraper.aclose()
     return articles
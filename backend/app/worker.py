@@ -0,0 +1,101 @@
+from arq import create_pool
+from arq.connections import ArqRedis, RedisSettings
+from dataclasses import replace
+from datetime import datetime
+from fastapi import HTTPException, Request
+from redis.exceptions import RedisError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict
+import asyncio
+import logging
+
+from app.cache import REDIS_URL, invalidate_cache
+from app.models import AsyncSessionLocal, NewsArticle, engine
+from app.scraper import WindFarmNewsScraper
+
+logger = logging.getLogger(__name__)
+
+REDIS_SETTINGS = RedisSettings.from_dsn(REDIS_URL)
+
+
+async def create_queue() -> ArqRedis:
+    """Create the arq Redis pool used to enqueue background jobs"""
+    # Fail fast instead of retrying: the API connects on demand and the next request retries
+    return await create_pool(replace(REDIS_SETTINGS, conn_retries=0))
+
+
+async def get_queue(request: Request) -> ArqRedis:
+    """Dependency for getting the shared job queue, connecting on first use"""
+    # Only the scrape endpoints need the queue, so a Redis outage must not block API startup
+    if request.app.state.queue is None:
+        try:
+            request.app.state.queue = await create_queue()
+        except (OSError, RedisError, asyncio.TimeoutError) as e:
+            logger.warning(f"Job queue unavailable: {e}")
+            raise HTTPException(status_code=503, detail="Job queue unavailable")
+    return request.app.state.queue
+
+
+async def save_articles(db: AsyncSession, articles: List[Dict]) -> int:
+    """Insert scraped articles, skipping already stored URLs; returns the number saved"""
+    if not articles:
+        return 0
+
+    # Let the unique index on url skip known articles in a single INSERT
+    scraped_at = datetime.utcnow()
+    stmt = pg_insert(NewsArticle).values([
+        {
+            'title': article_data['title'],
+            'url': article_data['url'],
+            'source': article_data['source'],
+            'published_date': article_data.get('published_date'),
+            'category': article_data.get('category', 'news'),
+            'scraped_at': scraped_at
+        }
+        for article_data in articles
+    ]).on_conflict_do_nothing(index_elements=['url']).returning(NewsArticle.id)
+
+    result = await db.execute(stmt)
+    saved_count = len(result.fetchall())
+    await db.commit()
+
+    return saved_count
+
+
+async def scrape_task(ctx) -> Dict:
+    """Scrape all sources and save new articles"""
+    articles = await ctx['scraper'].scrape_all()
+
+    async with AsyncSessionLocal() as db:
+        saved_count = await save_articles(db, articles)
+    ctx['scraper'].commit_validators()
+
+    await invalidate_cache(ctx['redis'])
+    logger.info(f"Saved {saved_count} new articles")
+
+    return {
+        "total_scraped": len(articles),
+        "new_articles_saved": saved_count
+    }
+
+
+async def startup(ctx):
+    """Worker startup: create the shared scraper"""
+    ctx['scraper'] = WindFarmNewsScraper()
+
+
+async def shutdown(ctx):
+    """Worker shutdown: close HTTP and database connections"""
+    await ctx['scraper'].aclose()
+    await engine.dispose()
+
+
+class WorkerSettings:
+    """arq worker configuration (run with: arq app.worker.WorkerSettings)"""
+    functions = [scrape_task]
+    # Jobs share one scraper and its pending validators, so scrapes must not overlap
+    max_jobs = 1
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = REDIS_SETTINGS
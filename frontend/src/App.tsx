@@ -5,6 +5,12 @@ import './App.css';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
+// Poll a scrape job every 2s for at most 3 minutes
+const SCRAPE_POLL_INTERVAL_MS = 2000;
+const SCRAPE_POLL_MAX_ATTEMPTS = 90;
+
+class ScrapeTimeoutError extends Error {}
+
 interface Stats {
   total_wind_farms: number;
   operational_farms: number;
@@ -13,6 +19,16 @@ interface Stats {
   total_news_articles: number;
 }
 
+interface ScrapeJob {
+  job_id: string;
+  status: 'deferred' | 'queued' | 'in_progress' | 'complete';
+  success?: boolean;
+  result?: {
+    total_scraped: number;
+    new_articles_saved: number;
+  };
+}
+
 function App() {
   const [stats, setStats] = useState<Stats | null>(null);
   const [scraping, setScraping] = useState(false);
@@ -30,16 +46,36 @@ function App() {
     }
   };
 
+  const waitForScrapeJob = async (jobId: string): Promise<ScrapeJob> => {
+    // Scraping runs in a background worker; poll until the job finishes or we give up
+    for (let attempt = 0; attempt < SCRAPE_POLL_MAX_ATTEMPTS; attempt++) {
+      const response = await axios.get<ScrapeJob>(`${API_URL}/api/news/scrape/${jobId}`);
+      if (response.data.status === 'complete') {
+        return response.data;
+      }
+      await new Promise((resolve) => setTimeout(resolve, SCRAPE_POLL_INTERVAL_MS));
+    }
+    throw new ScrapeTimeoutError('Timed out waiting for scrape job');
+  };
+
   const handleScrapeNews = async () => {
     setScraping(true);
     try {
       const response = await axios.post(`${API_URL}/api/news/scrape`);
-      alert(`Scraping completed! ${response.data.new_articles_saved} new articles saved.`);
+      const job = await waitForScrapeJob(response.data.job_id);
+      if (!job.success || !job.result) {
+        throw new Error('Scrape job failed');
+      }
+      alert(`Scraping completed! ${job.result.new_articles_saved} new articles saved.`);
       fetchStats();
       window.location.reload(); // Refresh map data
     } catch (err) {
       console.error('Error scraping news:', err);
-      alert('Failed to scrape news. Please try again.');
+      if (err instanceof ScrapeTimeoutError) {
+        alert('Scraping did not finish in time. Check that the scrape worker is running and try again.');
+      } else {
+        alert('Failed to scrape news. Please try again.');
+      }
     } finally {
       setScraping(false);
     }